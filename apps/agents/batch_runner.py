@@ -0,0 +1,240 @@
+"""
+Run many negotiation agent sessions concurrently.
+
+Each session gets a step budget (LangGraph's recursion limit) and a wall-clock
+budget, so a negotiation that never converges cannot hold up the batch.
+
+    python batch_runner.py --sessions 1000 --concurrency 100
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.errors import GraphRecursionError
+
+from graph import aresume_session, as_async, compile_app, session_config
+
+DEFAULT_MAX_STEPS = 25
+DEFAULT_TIMEOUT = 5.0
+BUDGET_OUTCOMES = ("step_budget_exceeded", "time_budget_exceeded")
+
+
+def _empty_stats() -> Dict[str, float]:
+    return {"calls": 0, "total_s": 0.0, "max_s": 0.0, "wait_total_s": 0.0, "wait_max_s": 0.0}
+
+
+class NodeTimer:
+    """
+    Accumulates per-node call counts and timings across sessions.
+
+    Node time covers only the node body. Time spent waiting for the event
+    loop after the node yields (other sessions running) is reported
+    separately as wait time.
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, node: str, elapsed: float, waited: float = 0.0):
+        entry = self.stats.setdefault(node, _empty_stats())
+        entry["calls"] += 1
+        entry["total_s"] += elapsed
+        entry["max_s"] = max(entry["max_s"], elapsed)
+        entry["wait_total_s"] += waited
+        entry["wait_max_s"] = max(entry["wait_max_s"], waited)
+
+    def merge(self, stats: Dict[str, Dict[str, float]]):
+        for node, other in stats.items():
+            entry = self.stats.setdefault(node, _empty_stats())
+            entry["calls"] += other["calls"]
+            for key in ("total_s", "wait_total_s"):
+                entry[key] += other[key]
+            for key in ("max_s", "wait_max_s"):
+                entry[key] = max(entry[key], other[key])
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            node: {
+                **entry,
+                "mean_ms": entry["total_s"] / entry["calls"] * 1000 if entry["calls"] else 0.0,
+                "mean_wait_ms": entry["wait_total_s"] / entry["calls"] * 1000 if entry["calls"] else 0.0,
+            }
+            for node, entry in self.stats.items()
+        }
+
+    def timed(self, node: str, fn):
+        """`as_async(fn)`, timing the body of the synchronous node `fn` and its event-loop wait."""
+        def body(state):
+            start = time.perf_counter()
+            return fn(state), start, time.perf_counter()
+        run = as_async(body)
+
+        async def wrapper(state):
+            queued = time.perf_counter()
+            result, start, end = await run(state)
+            self.record(node, end - start, start - queued)
+            return result
+        return wrapper
+
+
+async def run_session(app, item: str, target_price: float,
+                      max_steps: int = DEFAULT_MAX_STEPS, timeout: float = DEFAULT_TIMEOUT,
+                      thread_id: Optional[str] = None, resume: bool = False) -> Dict:
+    """
+    Run one session, or with `resume` continue a checkpointed `thread_id`
+    from its last saved step. Both get the full step and time budget.
+    """
+    config = {"recursion_limit": max_steps}
+    if resume:
+        run = aresume_session(app, thread_id, **config)
+    else:
+        initial = {
+            "messages": [],
+            "target_item": item,
+            "current_price": 0.0,
+            "target_price": target_price,
+            "negotiation_status": "scouting",
+        }
+        if thread_id is not None:
+            config = session_config(thread_id, **config)
+        run = app.ainvoke(initial, config=config)
+
+    start = time.perf_counter()
+    final_price = None
+    try:
+        state = await asyncio.wait_for(run, timeout=timeout)
+        outcome = state["negotiation_status"]
+        final_price = state["current_price"]
+    except GraphRecursionError:
+        outcome = "step_budget_exceeded"
+    except asyncio.TimeoutError:
+        outcome = "time_budget_exceeded"
+    return {
+        "target_item": item,
+        "thread_id": thread_id,
+        "outcome": outcome,
+        "final_price": final_price,
+        "elapsed_s": time.perf_counter() - start,
+    }
+
+
+async def run_batch(items: List[str], target_price: float = 120.0, concurrency: int = 50,
+                    max_steps: int = DEFAULT_MAX_STEPS, timeout: float = DEFAULT_TIMEOUT,
+                    analytic: bool = False, compact: bool = False,
+                    checkpoint: bool = False, resume_rounds: int = 0, thread_prefix: str = "session") -> Dict:
+    """
+    Run one session per item on the current event loop, at most `concurrency` at a time.
+
+    With `checkpoint`, each session is saved under its own thread_id after
+    every step. Sessions that run out of budget are then resumed from their
+    last step, up to `resume_rounds` more times, instead of being dropped.
+    """
+    timer = NodeTimer()
+    app = compile_app(analytic, compact, checkpointer=MemorySaver() if checkpoint else None, wrap=timer.timed)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(index: int, item: str, resume: bool = False):
+        thread_id = f"{thread_prefix}-{index}" if checkpoint else None
+        async with semaphore:
+            return await run_session(app, item, target_price, max_steps, timeout, thread_id, resume)
+
+    start = time.perf_counter()
+    sessions = await asyncio.gather(*(bounded(i, item) for i, item in enumerate(items)))
+    for session in sessions:
+        session["resumes"] = 0
+
+    for _ in range(resume_rounds if checkpoint else 0):
+        pending = [i for i, s in enumerate(sessions) if s["outcome"] in BUDGET_OUTCOMES]
+        if not pending:
+            break
+        resumed = await asyncio.gather(*(bounded(i, items[i], resume=True) for i in pending))
+        for i, session in zip(pending, resumed):
+            session["resumes"] = sessions[i]["resumes"] + 1
+            session["elapsed_s"] += sessions[i]["elapsed_s"]
+            sessions[i] = session
+
+    elapsed = time.perf_counter() - start
+    return _report(sessions, elapsed, timer)
+
+
+def _run_chunk(args) -> Dict:
+    return asyncio.run(run_batch(*args))
+
+
+def run_batch_pool(items: List[str], workers: int = 4, target_price: float = 120.0, concurrency: int = 50,
+                   max_steps: int = DEFAULT_MAX_STEPS, timeout: float = DEFAULT_TIMEOUT,
+                   analytic: bool = False, compact: bool = False,
+                   checkpoint: bool = False, resume_rounds: int = 0) -> Dict:
+    """Split the batch across worker processes, each running its own event loop (and checkpointer)."""
+    chunks = [items[i::workers] for i in range(workers) if items[i::workers]]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=len(chunks) or 1) as pool:
+        reports = list(pool.map(_run_chunk, [
+            (c, target_price, concurrency, max_steps, timeout, analytic, compact, checkpoint, resume_rounds, f"w{w}")
+            for w, c in enumerate(chunks)
+        ]))
+    elapsed = time.perf_counter() - start
+
+    timer = NodeTimer()
+    sessions = []
+    for report in reports:
+        sessions.extend(report["sessions"])
+        timer.merge(report["node_timings"])
+    return _report(sessions, elapsed, timer)
+
+
+def _report(sessions: List[Dict], elapsed: float, timer: NodeTimer) -> Dict:
+    outcomes: Dict[str, int] = {}
+    for session in sessions:
+        outcomes[session["outcome"]] = outcomes.get(session["outcome"], 0) + 1
+    return {
+        "sessions": sessions,
+        "outcomes": outcomes,
+        "elapsed_s": elapsed,
+        "sessions_per_sec": len(sessions) / elapsed if elapsed else 0.0,
+        "node_timings": timer.summary(),
+    }
+
+
+def print_report(report: Dict, workers: Optional[int] = None):
+    mode = f"{workers} processes" if workers else "asyncio"
+    print(f"{len(report['sessions'])} sessions in {report['elapsed_s']:.3f}s ({mode}): "
+          f"{report['sessions_per_sec']:,.1f} sessions/sec")
+    print(f"Outcomes: {report['outcomes']}")
+    resumed = sum(1 for session in report["sessions"] if session.get("resumes"))
+    if resumed:
+        print(f"Resumed from checkpoint: {resumed} sessions")
+    for node, entry in report["node_timings"].items():
+        print(f"  {node:<12} calls={entry['calls']:<8} mean={entry['mean_ms']:.3f}ms max={entry['max_s'] * 1000:.3f}ms "
+              f"wait mean={entry['mean_wait_ms']:.3f}ms max={entry['wait_max_s'] * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--max-steps", type=int, default=DEFAULT_MAX_STEPS)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--target-price", type=float, default=120.0)
+    parser.add_argument("--workers", type=int, default=0, help="Use a process pool with this many workers")
+    parser.add_argument("--analytic", action="store_true", help="Compute the deal price in one negotiator step")
+    parser.add_argument("--compact", action="store_true", help="Keep a bounded message history")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="Checkpoint each session under its own thread_id so out-of-budget sessions can resume")
+    parser.add_argument("--resume-rounds", type=int, default=1,
+                        help="With --checkpoint, how many times to resume out-of-budget sessions")
+    args = parser.parse_args()
+
+    items = [f"Item {i}" for i in range(args.sessions)]
+    if args.workers:
+        report = run_batch_pool(items, args.workers, args.target_price, args.concurrency,
+                                args.max_steps, args.timeout, args.analytic, args.compact,
+                                args.checkpoint, args.resume_rounds)
+    else:
+        report = asyncio.run(run_batch(items, args.target_price, args.concurrency,
+                                       args.max_steps, args.timeout, args.analytic, args.compact,
+                                       args.checkpoint, args.resume_rounds))
+    print_report(report, args.workers or None)
@@ -1,21 +1,39 @@
 from langgraph.graph import StateGraph, END
 from typing import TypedDict, Annotated, List
+import asyncio
+import logging
 import operator
 import random
 
-class AgentState(TypedDict):
-    messages: Annotated[list[str], operator.add]
+logger = logging.getLogger(__name__)
+
+COUNTER_OFFER_FACTOR = 0.95  # each counter-offer cuts the price by 5%
+MESSAGE_HISTORY_LIMIT = 20
+
+def append_bounded(left: list[str], right: list[str]) -> list[str]:
+    """Reducer that keeps only the most recent MESSAGE_HISTORY_LIMIT messages."""
+    return (left + right)[-MESSAGE_HISTORY_LIMIT:]
+
+class NegotiationState(TypedDict):
+    """The fields nodes read; nodes only ever append to `messages`."""
     target_item: str
     current_price: float
     target_price: float
     negotiation_status: str # 'scouting', 'negotiating', 'deal_reached', 'failed'
 
+class AgentState(NegotiationState):
+    messages: Annotated[list[str], operator.add]
+
+class CompactAgentState(NegotiationState):
+    """AgentState with bounded message history, for long-running sessions."""
+    messages: Annotated[list[str], append_bounded]
+
 # --- Nodes ---
 
-def web_scout(state: AgentState):
+def web_scout(state: NegotiationState):
     """Scouts the web for the item."""
     item = state.get("target_item", "Unknown Item")
-    print(f"Scout: Searching for {item}...")
+    logger.info(f"Scout: Searching for {item}...")
     
     # Simulate finding a price
     found_price = random.uniform(100, 200)
@@ -25,12 +43,12 @@ def web_scout(state: AgentState):
         "negotiation_status": "negotiating"
     }
 
-def negotiator(state: AgentState):
+def negotiator(state: NegotiationState):
     """Negotiates the price."""
     current_price = state["current_price"]
     target_price = state.get("target_price", 120.0)
     
-    print(f"Negotiator: Current price is ${current_price:.2f}, target is ${target_price:.2f}")
+    logger.info(f"Negotiator: Current price is ${current_price:.2f}, target is ${target_price:.2f}")
     
     if current_price <= target_price:
         return {
@@ -39,31 +57,64 @@ def negotiator(state: AgentState):
         }
     else:
         # Simulate negotiation attempt
-        new_price = current_price * 0.95
+        new_price = current_price * COUNTER_OFFER_FACTOR
         return {
             "messages": [f"Negotiator: Counter-offered. New price: ${new_price:.2f}"],
             "current_price": new_price,
             "negotiation_status": "negotiating" if new_price > target_price else "deal_reached"
         }
 
-def compliance_check(state: AgentState):
+def negotiate_in_one_step(current_price: float, target_price: float,
+                          factor: float = COUNTER_OFFER_FACTOR) -> tuple[float, int]:
+    """Replays the negotiator's counter-offers; returns the final price and the number of rounds."""
+    if current_price <= target_price:
+        return current_price, 1
+    if target_price <= 0 or not 0 < factor < 1:
+        raise ValueError("Negotiation cannot converge on a non-positive target price")
+
+    price = current_price * factor
+    rounds = 1
+    while price > target_price:
+        price *= factor
+        rounds += 1
+    return price, rounds
+
+def negotiator_analytic(state: NegotiationState):
+    """Negotiates the price in a single graph step, replaying every counter-offer at once."""
+    current_price = state["current_price"]
+    target_price = state.get("target_price", 120.0)
+    try:
+        final_price, rounds = negotiate_in_one_step(current_price, target_price)
+    except ValueError as e:
+        return {
+            "messages": [f"Negotiator: {e}"],
+            "negotiation_status": "failed"
+        }
+    return {
+        "messages": [f"Negotiator: Deal reached at ${final_price:.2f} after {rounds} round(s)."],
+        "current_price": final_price,
+        "negotiation_status": "deal_reached"
+    }
+
+def compliance_check(state: NegotiationState):
     """Checks if the deal is compliant."""
     status = state["negotiation_status"]
     if status == "deal_reached":
         return {"messages": ["Compliance: Deal approved. Proceeding to purchase."]}
     return {"messages": ["Compliance: Monitoring negotiation..."]}
 
-# --- Graph Construction ---
-
-workflow = StateGraph(AgentState)
+# --- Async Nodes ---
 
-workflow.add_node("scout", web_scout)
-workflow.add_node("negotiator", negotiator)
-workflow.add_node("compliance", compliance_check)
+def as_async(node):
+    """Async version of a node that yields to the event loop first, so many sessions can share one loop."""
+    async def run(state):
+        await asyncio.sleep(0)
+        return node(state)
+    return run
 
-workflow.set_entry_point("scout")
+# --- Graph Construction ---
 
-def router(state: AgentState):
+def router(state: NegotiationState):
     if state["negotiation_status"] == "deal_reached":
         return "compliance"
     elif state["negotiation_status"] == "negotiating":
@@ -71,18 +122,69 @@ def router(state: AgentState):
     else:
         return END
 
-workflow.add_conditional_edges(
-    "scout",
-    router,
-    {"negotiator": "negotiator", "compliance": "compliance", END: END}
-)
+def build_workflow(scout=web_scout, negotiate=negotiator, compliance=compliance_check, state_schema=AgentState):
+    """Build the agent graph; pass async nodes to get a graph for `ainvoke`."""
+    workflow = StateGraph(state_schema)
+
+    workflow.add_node("scout", scout)
+    workflow.add_node("negotiator", negotiate)
+    workflow.add_node("compliance", compliance)
+
+    workflow.set_entry_point("scout")
+
+    workflow.add_conditional_edges(
+        "scout",
+        router,
+        {"negotiator": "negotiator", "compliance": "compliance", END: END}
+    )
+
+    workflow.add_conditional_edges(
+        "negotiator",
+        router,
+        {"negotiator": "negotiator", "compliance": "compliance", END: END}
+    )
+
+    workflow.add_edge("compliance", END)
+    return workflow
+
+def compile_app(analytic: bool = False, compact: bool = False, checkpointer=None,
+                asynchronous: bool = False, wrap=None):
+    """
+    Compile a configured agent graph.
+
+    analytic: replace the per-5% negotiator loop with negotiator_analytic.
+    compact: use CompactAgentState (bounded message history).
+    checkpointer: e.g. MemorySaver(); state is saved after every step under the
+        `thread_id` in config["configurable"], so `resume_session` can continue
+        an interrupted session from its last step.
+    asynchronous: run each node through `as_async`, for `ainvoke`.
+    wrap: optional `wrap(name, node)` applied to each synchronous node instead,
+        e.g. to add instrumentation; its result is what the graph runs.
+    """
+    nodes = {
+        "scout": web_scout,
+        "negotiator": negotiator_analytic if analytic else negotiator,
+        "compliance": compliance_check,
+    }
+    if wrap is not None:
+        nodes = {name: wrap(name, node) for name, node in nodes.items()}
+    elif asynchronous:
+        nodes = {name: as_async(node) for name, node in nodes.items()}
+    return build_workflow(
+        nodes["scout"], nodes["negotiator"], nodes["compliance"],
+        state_schema=CompactAgentState if compact else AgentState
+    ).compile(checkpointer=checkpointer)
+
+def session_config(thread_id: str, **config) -> dict:
+    return {**config, "configurable": {"thread_id": thread_id}}
 
-workflow.add_conditional_edges(
-    "negotiator",
-    router,
-    {"negotiator": "negotiator", "compliance": "compliance", END: END}
-)
+def resume_session(graph, thread_id: str, **config):
+    """Continue a checkpointed session from its last saved step."""
+    return graph.invoke(None, session_config(thread_id, **config))
 
-workflow.add_edge("compliance", END)
+async def aresume_session(graph, thread_id: str, **config):
+    """Async `resume_session`, for graphs run with `ainvoke` (asynchronous=True or an async `wrap`)."""
+    return await graph.ainvoke(None, session_config(thread_id, **config))
 
+workflow = build_workflow()
 app = workflow.compile()
@@ -1,17 +1,31 @@
 import os
+import logging
+from functools import lru_cache
 from typing import List, Dict
-import anthropic
-from openai import AsyncOpenAI
+from metrics import track_llm_call
 
-# Initialize clients
-openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-anthropic_client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+logger = logging.getLogger(__name__)
 
-# Perplexity Client (uses OpenAI SDK)
-perplexity_client = AsyncOpenAI(
-    api_key=os.getenv("PERPLEXITY_API_KEY"),
-    base_url="https://api.perplexity.ai"
-)
+# Clients are created on first use so importing this module stays cheap
+# and providers without a key never construct an SDK client.
+@lru_cache(maxsize=None)
+def get_openai_client():
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+@lru_cache(maxsize=None)
+def get_anthropic_client():
+    import anthropic
+    return anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+
+@lru_cache(maxsize=None)
+def get_perplexity_client():
+    # Perplexity Client (uses OpenAI SDK)
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(
+        api_key=os.getenv("PERPLEXITY_API_KEY"),
+        base_url="https://api.perplexity.ai"
+    )
 
 # System prompt for OmniNexus AI Assistant
 SYSTEM_PROMPT = """You are the OmniNexus AI Assistant, a world-class financial expert and premier enterprise intelligence agent designed for top-tier financial institutions like Goldman Sachs, JP Morgan, and Morgan Stanley.
@@ -63,16 +77,17 @@ async def get_ai_response(message: str, history: List[Dict] = None) -> str:
             
             messages.append({"role": "user", "content": message})
             
-            response = await openai_client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=messages,
-                max_tokens=1000,
-                temperature=0.7
-            )
+            with track_llm_call("openai"):
+                response = await get_openai_client().chat.completions.create(
+                    model="gpt-4-turbo-preview",
+                    messages=messages,
+                    max_tokens=1000,
+                    temperature=0.7
+                )
             
             return response.choices[0].message.content
         except Exception as e:
-            print(f"OpenAI API failed, falling back: {e}")
+            logger.warning(f"OpenAI API failed, falling back: {e}")
     
     # 2. Try Anthropic Claude (Secondary)
     if os.getenv("ANTHROPIC_API_KEY") and os.getenv("ANTHROPIC_API_KEY") != "your_anthropic_api_key_here":
@@ -86,16 +101,17 @@ async def get_ai_response(message: str, history: List[Dict] = None) -> str:
             
             conversation.append({"role": "user", "content": message})
             
-            response = anthropic_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=1000,
-                system=SYSTEM_PROMPT,
-                messages=conversation
-            )
+            with track_llm_call("anthropic"):
+                response = get_anthropic_client().messages.create(
+                    model="claude-3-5-sonnet-20241022",
+                    max_tokens=1000,
+                    system=SYSTEM_PROMPT,
+                    messages=conversation
+                )
             
             return response.content[0].text
         except Exception as e:
-            print(f"Anthropic API failed, falling back: {e}")
+            logger.warning(f"Anthropic API failed, falling back: {e}")
     
     # 3. Try Perplexity (Tertiary - for real-time/search queries)
     if os.getenv("PERPLEXITY_API_KEY") and os.getenv("PERPLEXITY_API_KEY") != "your_perplexity_api_key_here":
@@ -110,15 +126,16 @@ async def get_ai_response(message: str, history: List[Dict] = None) -> str:
             
             messages.append({"role": "user", "content": message})
             
-            response = await perplexity_client.chat.completions.create(
-                model="sonar-pro",
-                messages=messages,
-                max_tokens=1000,
-                temperature=0.7
-            )
+            with track_llm_call("perplexity"):
+                response = await get_perplexity_client().chat.completions.create(
+                    model="sonar-pro",
+                    messages=messages,
+                    max_tokens=1000,
+                    temperature=0.7
+                )
             return response.choices[0].message.content
         except Exception as e:
-            print(f"Perplexity API failed: {e}")
+            logger.warning(f"Perplexity API failed: {e}")
     
     # No valid API keys or all failed
     return "I'm currently in demo mode. To enable AI-powered responses, please add your OPENAI_API_KEY, ANTHROPIC_API_KEY, or PERPLEXITY_API_KEY to the .env file."
@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 from typing import List, Optional
+from rule_engine import compile_rules
 
 class Document(BaseModel):
     id: str
@@ -15,29 +16,52 @@ class ComplianceCheckResult(BaseModel):
     risk_score: int  # 0-100
     issues: List[str]
 
-def check_kyc_compliance(documents: List[Document]) -> ComplianceCheckResult:
-    issues = []
-    risk_score = 0
-    
-    required_types = {'Passport', 'Utility Bill', 'Incorporation Cert'}
-    submitted_types = {doc.type for doc in documents if doc.status in ('submitted', 'approved')}
-    
-    missing = required_types - submitted_types
-    if missing:
-        issues.append(f"Missing mandatory documents: {', '.join(missing)}")
-        risk_score += 30 * len(missing)
-
-    for doc in documents:
-        if doc.status == 'pending' and doc.due_date < datetime.now():
-            issues.append(f"Document {doc.name} is overdue")
-            risk_score += 10
-        
-        if doc.status == 'rejected':
-            issues.append(f"Document {doc.name} was rejected")
-            risk_score += 20
+# Declarative KYC rule set, compiled once at import into an evaluation plan.
+KYC_RULES = {
+    "predicates": {
+        "submitted": [("status", "in", ("submitted", "approved"))],
+        "overdue": [("status", "eq", "pending"), ("due_date", "lt", "$now")],
+        "rejected": [("status", "eq", "rejected")],
+    },
+    "rules": [
+        {
+            "kind": "missing",
+            "when": "submitted",
+            "field": "type",
+            "values": ["Passport", "Utility Bill", "Incorporation Cert"],
+            "weight": 30,
+            "message": "Missing mandatory documents: {values}",
+        },
+        {"kind": "each", "when": "overdue", "weight": 10, "message": "Document {doc.name} is overdue"},
+        {"kind": "each", "when": "rejected", "weight": 20, "message": "Document {doc.name} was rejected"},
+    ],
+    "pass_threshold": 50,
+    "score_cap": 100,
+}
 
+kyc_plan = compile_rules(KYC_RULES)
+
+def check_kyc_compliance(documents: List[Document], now: Optional[datetime] = None) -> ComplianceCheckResult:
+    risk_score, issues = kyc_plan.evaluate(documents, now)
     return ComplianceCheckResult(
-        passed=risk_score < 50,
-        risk_score=min(risk_score, 100),
+        passed=risk_score < kyc_plan.pass_threshold,
+        risk_score=min(risk_score, kyc_plan.score_cap),
         issues=issues
     )
+
+def check_kyc_compliance_bulk(clients: List[List[Document]], now: Optional[datetime] = None) -> List[ComplianceCheckResult]:
+    """Evaluate many clients' document sets against a single point in time."""
+    threshold, cap = kyc_plan.pass_threshold, kyc_plan.score_cap
+
+    def build(risk_score: int, issues: List[str]) -> ComplianceCheckResult:
+        return ComplianceCheckResult(
+            passed=risk_score < threshold,
+            risk_score=risk_score if risk_score < cap else cap,
+            issues=issues
+        )
+
+    return kyc_plan.evaluate_many(clients, now, build)
+
+def score_kyc_risk_bulk(clients: List[List[Document]], now: Optional[datetime] = None) -> List[int]:
+    """Risk scores only; skips issue messages and stops early once a client hits the cap."""
+    return kyc_plan.score_many(clients, now)
@@ -11,6 +11,11 @@ print("Starting debug server...")
 try:
     from main import app
     print("Successfully imported app from main")
+
+    # The app no longer creates tables on import; do it here like migrate.py.
+    from database import init_db
+    init_db()
+    print("Database schema is up to date")
     
     uvicorn.run(app, host="0.0.0.0", port=8000)
 except Exception as e:
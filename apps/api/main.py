@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, status, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from typing import List
@@ -8,20 +8,24 @@ import os
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 
+load_dotenv()  # Before local imports so .env settings (e.g. DATABASE_URL) apply to them
+
 # Import modules
 from compliance import Document, check_kyc_compliance
 from prediction import PredictionRequest, get_prediction
-from database import init_db, get_db, User, DataEntry
+from database import init_db, get_db, engine, User, DataEntry
+from metrics import MetricsMiddleware, TracedRoute, instrument_engine, render_metrics
 from auth import (
     Token, UserCreate, UserResponse, 
     verify_password, get_password_hash, create_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
-load_dotenv()
-init_db()  # Initialize database tables
+# Schema creation is a deploy step (python migrate.py), not an import side effect
+instrument_engine(engine)
 
 app = FastAPI(title="OmniNexus API", version="2.0.0")
+app.router.route_class = TracedRoute  # lets sampled profiles follow sync endpoints onto their worker thread
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -34,6 +38,7 @@ app.add_middleware(
     allow_headers=["*"],
     expose_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Mock Database for old endpoints
 mock_documents = [
@@ -176,6 +181,12 @@ def read_root():
 def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/health/ai")
 def ai_health_check():
     """Check AI service status and configured providers"""
@@ -226,4 +237,5 @@ async def ai_chat(request: ChatRequest):
 
 if __name__ == "__main__":
     import uvicorn
+    init_db()  # Local runs: make sure tables exist
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,242 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter as StackCounter
+from contextlib import contextmanager
+
+from fastapi.routing import APIRoute
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from sqlalchemy import event
+
+logger = logging.getLogger("omninexus.metrics")
+
+# Sampled profiling of slow requests (disabled unless the sample rate is > 0)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+PROFILE_INTERVAL_S = 0.005
+IDLE_FRAMES = {"select", "poll", "wait", "_wait_for_tstate_lock"}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "omninexus_http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "omninexus_http_requests_in_progress", "HTTP requests currently being served",
+)
+DB_QUERIES = Counter(
+    "omninexus_db_queries_total", "SQL statements executed", ["operation"],
+)
+DB_QUERY_DURATION = Histogram(
+    "omninexus_db_query_duration_seconds", "SQL statement latency", ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+LLM_REQUEST_DURATION = Histogram(
+    "omninexus_llm_request_duration_seconds", "LLM provider call latency", ["provider", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+LLM_ERRORS = Counter(
+    "omninexus_llm_errors_total", "Failed LLM provider calls", ["provider"],
+)
+THREADPOOL_BUSY = Gauge(
+    "omninexus_threadpool_busy_threads", "Worker threads running sync endpoints",
+)
+THREADPOOL_QUEUE_DEPTH = Gauge(
+    "omninexus_threadpool_queue_depth", "Sync endpoint calls waiting for a worker thread",
+)
+
+# Per-request trace, shared with the threadpool through context propagation
+class RequestTrace:
+    __slots__ = ("request_id", "db_queries", "db_time", "thread_ids")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.thread_ids = set()  # worker threads that ran this request's sync endpoint
+
+current_trace: contextvars.ContextVar = contextvars.ContextVar("current_trace", default=None)
+
+
+def _bind_thread(endpoint):
+    @functools.wraps(endpoint)
+    def run(*args, **kwargs):
+        trace = current_trace.get()
+        if trace is not None:
+            trace.thread_ids.add(threading.get_ident())
+        return endpoint(*args, **kwargs)
+    return run
+
+
+class TracedRoute(APIRoute):
+    """Route class that records which worker thread runs each sync endpoint, for the profiler."""
+
+    def __init__(self, path, endpoint, **kwargs):
+        if not asyncio.iscoroutinefunction(endpoint):
+            endpoint = _bind_thread(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+class _StackSampler:
+    """
+    Samples the stacks of one request's threads while it runs.
+
+    That is the worker thread(s) recorded on its RequestTrace plus the event
+    loop thread. The loop is shared, so its samples (marked "[loop]") also
+    include any other request in flight; "[worker]" samples are this request's.
+    """
+
+    def __init__(self, trace: RequestTrace, interval: float = PROFILE_INTERVAL_S):
+        self.trace = trace
+        self.interval = interval
+        self.stacks = StackCounter()
+        self._loop_thread = threading.get_ident()
+        self._on_done = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            targets = [(self._loop_thread, "[loop]")] + [(ident, "[worker]") for ident in tuple(self.trace.thread_ids)]
+            for ident, label in targets:
+                frame = frames.get(ident)
+                if frame is None or frame.f_code.co_name in IDLE_FRAMES:
+                    continue
+                stack = traceback.extract_stack(frame, limit=12)
+                self.stacks[f"{label} " + " <- ".join(f"{f.name} ({os.path.basename(f.filename)}:{f.lineno})"
+                                                      for f in reversed(stack))] += 1
+        if self._on_done is not None:
+            self._on_done(self)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, on_done=None):
+        """
+        Signal the sampler to stop without waiting for it. `on_done(sampler)`
+        runs on the sampler thread after its last sample, so reading the
+        stacks there never races with sampling and never blocks the event loop.
+        """
+        self._on_done = on_done
+        self._stop.set()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency and a request id.
+
+    Written against raw ASGI rather than BaseHTTPMiddleware to keep the
+    per-request overhead to a couple of timer reads and a histogram update.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        trace = RequestTrace(request_id or uuid.uuid4().hex)
+        token = current_trace.set(trace)
+        status_code = 500
+
+        async def send_with_trace(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", trace.request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        sampler = None
+        if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+            sampler = _StackSampler(trace)
+            sampler.start()
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status_code)
+            ).observe(elapsed)
+            current_trace.reset(token)
+            if sampler:
+                if elapsed * 1000 >= SLOW_REQUEST_MS:
+                    sampler.stop(functools.partial(_log_profile, scope, trace, elapsed))
+                else:
+                    sampler.stop()
+
+
+def _log_profile(scope, trace: RequestTrace, elapsed: float, sampler: _StackSampler):
+    top = "\n".join(f"  {count:>5}  {stack}" for stack, count in sampler.stacks.most_common(10))
+    logger.warning(
+        f"Slow request {trace.request_id} {scope['method']} {scope['path']}: {elapsed * 1000:.1f}ms, "
+        f"{trace.db_queries} queries ({trace.db_time * 1000:.1f}ms), "
+        f"{len(trace.thread_ids)} worker thread(s); [loop] samples are shared with concurrent requests\n{top}"
+    )
+
+
+def instrument_engine(engine):
+    """Count and time every statement executed through a SQLAlchemy engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        DB_QUERIES.labels(operation).inc()
+        DB_QUERY_DURATION.labels(operation).observe(elapsed)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.db_queries += 1
+            trace.db_time += elapsed
+
+
+@contextmanager
+def track_llm_call(provider: str):
+    """Time an LLM provider call; failures are counted and re-raised."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        LLM_ERRORS.labels(provider).inc()
+        LLM_REQUEST_DURATION.labels(provider, "error").observe(time.perf_counter() - start)
+        raise
+    LLM_REQUEST_DURATION.labels(provider, "success").observe(time.perf_counter() - start)
+
+
+def render_metrics():
+    """Prometheus exposition text; refreshes gauges that are read on demand."""
+    try:
+        from anyio import to_thread
+        stats = to_thread.current_default_thread_limiter().statistics()
+        THREADPOOL_BUSY.set(stats.borrowed_tokens)
+        THREADPOOL_QUEUE_DEPTH.set(stats.tasks_waiting)
+    except RuntimeError:
+        pass  # not inside an event loop
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,16 @@
+"""
+Create the database schema.
+
+Run once per deploy, before starting the API:
+
+    python migrate.py
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from database import init_db, DATABASE_URL  # noqa: E402
+
+if __name__ == "__main__":
+    init_db()
+    print(f"Database schema is up to date ({DATABASE_URL.split('://')[0]}).")
@@ -0,0 +1,273 @@
+import keyword
+from datetime import datetime
+from string import Formatter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Condition operators as expression templates. The value "$now" is bound at evaluation time.
+OPERATORS: Dict[str, str] = {
+    "eq": "{a} == {b}",
+    "ne": "{a} != {b}",
+    "in": "{a} in {b}",
+    "lt": "({a} is not None and {a} < {b})",
+    "le": "({a} is not None and {a} <= {b})",
+    "gt": "({a} is not None and {a} > {b})",
+    "ge": "({a} is not None and {a} >= {b})",
+}
+
+RULE_KINDS = ("missing", "each")
+REQUIRED_RULE_KEYS = ("when", "weight", "message")
+
+
+class RulePlan:
+    """
+    Compiled evaluation plan for a declarative rule set.
+
+    The rule set is compiled into straight-line Python: every document field
+    is read once, conditions shared by several predicates are computed once,
+    each predicate is evaluated once per document no matter how many rules
+    use it, and issue messages are f-strings over those locals. `source`
+    holds the generated code for inspection.
+    """
+
+    def __init__(self, evaluate_fn, evaluate_many_fn, score_fn, source: str,
+                 pass_threshold: int, score_cap: int):
+        self._evaluate = evaluate_fn
+        self._evaluate_many = evaluate_many_fn
+        self._score = score_fn
+        self.source = source
+        self.pass_threshold = pass_threshold
+        self.score_cap = score_cap
+
+    def evaluate(self, documents: Sequence, now: Optional[datetime] = None) -> Tuple[int, List[str]]:
+        """Run every rule and return the uncapped score and all issues."""
+        return self._evaluate(documents, now or datetime.now())
+
+    def score(self, documents: Sequence, now: Optional[datetime] = None) -> int:
+        """Score only, stopping as soon as the score reaches the cap."""
+        return self._score(documents, now or datetime.now(), self.score_cap)
+
+    def evaluate_many(self, clients: Sequence[Sequence], now: Optional[datetime] = None,
+                      build: Optional[Callable[[int, List[str]], Any]] = None) -> List[Any]:
+        """
+        `evaluate` for many clients in one generated loop, against a single `now`.
+
+        Results are `(score, issues)` tuples, or `build(score, issues)` when
+        given, so callers get their result objects without an intermediate list.
+        """
+        return self._evaluate_many(clients, now or datetime.now(), build or _pair)
+
+    def score_many(self, clients: Sequence[Sequence], now: Optional[datetime] = None) -> List[int]:
+        score = self._score
+        now = now or datetime.now()
+        cap = self.score_cap
+        return [score(documents, now, cap) for documents in clients]
+
+
+def _pair(score: int, issues: List[str]) -> Tuple[int, List[str]]:
+    return score, issues
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+def _check_identifier(name: Any, what: str) -> str:
+    # Names end up in generated source, so only plain identifiers are accepted.
+    if not isinstance(name, str) or not name.isidentifier() or keyword.iskeyword(name):
+        raise ValueError(f"Invalid {what} '{name}': must be a Python identifier")
+    return name
+
+
+def _compile_message(template: str, resolve) -> str:
+    """Turn a str.format template into f-string source; `resolve` maps field names to expressions."""
+    if not isinstance(template, str):
+        raise ValueError("Rule 'message' must be a string")
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if conversion not in (None, "r", "s", "a"):
+            raise ValueError(f"Invalid conversion '!{conversion}' in message '{template}'")
+        if spec and ("{" in spec or "}" in spec):
+            raise ValueError(f"Nested format fields are not supported in message '{template}'")
+        parts.append("{" + resolve(field) + (f"!{conversion}" if conversion else "")
+                     + (f":{spec}" if spec else "") + "}")
+    return "f" + repr("".join(parts))
+
+
+def compile_rules(spec: Dict[str, Any]) -> RulePlan:
+    """
+    Compile a rule spec into a RulePlan.
+
+    spec = {
+        "predicates": {name: [(field, op, value), ...]},   # conjunction
+        "rules": [{"kind": "missing" | "each", "when": name, "weight": int,
+                   "message": str, "field": str, "values": [...]}],
+        "pass_threshold": int,
+        "score_cap": int,
+    }
+
+    "missing" rules add `weight` for every entry of `values` not seen in
+    `field` across documents matching `when`, and their message may use
+    `{values}`; "each" rules add `weight` per matching document, and their
+    message may use `{doc.<field>}`. Invalid specs raise ValueError.
+    """
+    declared = spec.get("predicates", {})
+    rules = spec.get("rules", [])
+    namespace: Dict[str, Any] = {}
+    fields: Dict[str, str] = {}
+    conditions: Dict[Tuple, str] = {}
+    condition_uses: Dict[str, int] = {}
+    predicates: Dict[str, List[str]] = {}
+
+    def constant(value: Any) -> str:
+        name = f"K{len(namespace)}"
+        namespace[name] = value
+        return name
+
+    def field_var(field: str) -> str:
+        if field not in fields:
+            fields[_check_identifier(field, "field")] = f"f{len(fields)}"
+        return fields[field]
+
+    def resolve_predicate(name: str) -> str:
+        if name not in declared:
+            raise ValueError(f"Unknown predicate '{name}'")
+        if name not in predicates:
+            conjunction = declared[name]
+            if not conjunction:
+                raise ValueError(f"Predicate '{name}' has no conditions")
+            terms = []
+            for condition in conjunction:
+                if not isinstance(condition, (list, tuple)) or len(condition) != 3:
+                    raise ValueError(f"Predicate '{name}': condition {condition!r} must be (field, op, value)")
+                field, op, value = condition
+                if op not in OPERATORS:
+                    raise ValueError(f"Unknown operator '{op}' for field '{field}'")
+                value = _freeze(value)
+                key = (field, op, value)
+                if key not in conditions:
+                    rhs = "now" if value == "$now" else constant(value)
+                    conditions[key] = OPERATORS[op].format(a=field_var(field), b=rhs)
+                expr = conditions[key]
+                condition_uses[expr] = condition_uses.get(expr, 0) + 1
+                terms.append(expr)
+            predicates[name] = terms
+        return f"p{list(predicates).index(name)}"
+
+    missing_rules = []
+    each_rules = []
+    for i, rule in enumerate(rules):
+        kind = rule.get("kind")
+        if kind not in RULE_KINDS:
+            raise ValueError(f"Unknown rule kind '{kind}'")
+        for key in REQUIRED_RULE_KEYS:
+            if key not in rule:
+                raise ValueError(f"Rule {i} ({kind}) is missing '{key}'")
+        try:
+            weight = int(rule["weight"])
+        except (TypeError, ValueError):
+            raise ValueError(f"Rule {i} ({kind}) has non-numeric weight {rule['weight']!r}") from None
+        compiled = {
+            "predicate": resolve_predicate(rule["when"]),
+            "weight": weight,
+            "message": rule["message"],
+        }
+        if kind == "missing":
+            if not rule.get("field") or not rule.get("values"):
+                raise ValueError("'missing' rules require 'field' and 'values'")
+            compiled["field"] = field_var(rule["field"])
+            compiled["values"] = constant(tuple(rule["values"]))
+            missing_rules.append(compiled)
+        else:
+            each_rules.append(compiled)
+
+    # Messages are compiled last so they can reuse every field already bound to a local.
+    def resolve_doc_field(name: str) -> str:
+        if not name.startswith("doc."):
+            raise ValueError(f"Unknown message field '{name}'; use '{{doc.<field>}}'")
+        attr = _check_identifier(name[len("doc."):], "message field")
+        return fields.get(attr, f"doc.{attr}")
+
+    def resolve_values(name: str) -> str:
+        if name != "values":
+            raise ValueError(f"Unknown message field '{name}'; 'missing' rules only provide '{{values}}'")
+        return "values"
+
+    for r in each_rules:
+        r["message"] = _compile_message(r["message"], resolve_doc_field)
+    for r in missing_rules:
+        r["message"] = _compile_message(r["message"], resolve_values)
+
+    # Conditions used by more than one predicate are hoisted into locals.
+    shared = {}
+    for expr, uses in condition_uses.items():
+        if uses > 1:
+            shared[expr] = f"c{len(shared)}"
+
+    def loop_header(ind: str) -> List[str]:
+        lines = [f"{ind}for doc in documents:"]
+        lines += [f"{ind}    {var} = doc.{field}" for field, var in fields.items()]
+        lines += [f"{ind}    {var} = {expr}" for expr, var in shared.items()]
+        for i, terms in enumerate(predicates.values()):
+            lines.append(f"{ind}    p{i} = " + " and ".join(shared.get(t, t) for t in terms))
+        return lines
+
+    def seen_lines(ind: str) -> List[str]:
+        return [f"{ind}if {r['predicate']}: seen{i}.add({r['field']})" for i, r in enumerate(missing_rules)]
+
+    def inits(ind: str) -> List[str]:
+        return [f"{ind}seen{i} = set()" for i in range(len(missing_rules))]
+
+    def evaluate_body(ind: str) -> List[str]:
+        """Leaves `score` and `issues` bound for one client's `documents`."""
+        lines = [f"{ind}score = 0", f"{ind}issues = []"] + inits(ind) + loop_header(ind) + seen_lines(ind + "    ")
+        for r in each_rules:
+            lines.append(f"{ind}    if {r['predicate']}:")
+            lines.append(f"{ind}        issues.append({r['message']})")
+            lines.append(f"{ind}        score += {r['weight']}")
+        if missing_rules:
+            lines.append(f"{ind}head = []")
+            for i, r in enumerate(missing_rules):
+                lines.append(f"{ind}missing = [v for v in {r['values']} if v not in seen{i}]")
+                lines.append(f"{ind}if missing:")
+                lines.append(f"{ind}    values = ', '.join(missing)")
+                lines.append(f"{ind}    head.append({r['message']})")
+                lines.append(f"{ind}    score += {r['weight']} * len(missing)")
+            # Missing-document issues are reported before per-document ones.
+            lines.append(f"{ind}if head:")
+            lines.append(f"{ind}    head.extend(issues)")
+            lines.append(f"{ind}    issues = head")
+        return lines
+
+    evaluate_src = ["def evaluate(documents, now):"] + evaluate_body("    ") + ["    return score, issues"]
+
+    evaluate_many_src = ["def evaluate_many(clients, now, build):", "    results = []", "    add_result = results.append",
+                         "    for documents in clients:"]
+    evaluate_many_src += evaluate_body("        ") + ["        add_result(build(score, issues))", "    return results"]
+
+    score_src = ["def score(documents, now, cap):", "    score = 0"]
+    score_src += inits("    ") + loop_header("    ")
+    for r in each_rules:
+        score_src.append(f"        if {r['predicate']}: score += {r['weight']}")
+    if each_rules:
+        score_src.append("        if score >= cap: return cap")
+    score_src += seen_lines("        ")
+    for i, r in enumerate(missing_rules):
+        score_src.append(f"    score += {r['weight']} * sum(1 for v in {r['values']} if v not in seen{i})")
+    score_src.append("    return score if score < cap else cap")
+
+    source = "\n\n".join("\n".join(src) for src in (evaluate_src, evaluate_many_src, score_src)) + "\n"
+    exec(compile(source, "<rule_plan>", "exec"), namespace)
+
+    return RulePlan(
+        evaluate_fn=namespace["evaluate"],
+        evaluate_many_fn=namespace["evaluate_many"],
+        score_fn=namespace["score"],
+        source=source,
+        pass_threshold=spec.get("pass_threshold", 50),
+        score_cap=spec.get("score_cap", 100),
+    )
@@ -0,0 +1,121 @@
+"""
+Cold-start benchmark for the API: import time of `main` and time to first response.
+
+Each run starts a fresh interpreter, so nothing is cached between runs except
+the OS page cache and bytecode. Uses a throwaway SQLite database.
+
+    python benchmarks/bench_cold_start.py --runs 5
+
+Each measurement is reported as a case with one sample per run, so the
+latency percentiles are over runs. Results are written as JSON (see
+common.write_results) for benchmarks/compare.py.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from common import ROOT, free_port, print_table, summarize, write_results
+
+API_DIR = os.path.join(ROOT, "apps", "api")
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import main; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def get(url: str, timeout: float = 30.0) -> float:
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def measure_import(env) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=API_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure_first_response(env, deadline: float = 60.0) -> dict:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError("API process exited during startup")
+            try:
+                get(f"{base}/health", timeout=1.0)
+                break
+            except OSError:
+                if time.perf_counter() - start > deadline:
+                    raise RuntimeError("API did not become ready in time")
+                time.sleep(0.01)
+        ready = time.perf_counter() - start
+        return {
+            "time_to_first_response": ready,
+            "first_health_ai": get(f"{base}/health/ai"),
+            "first_ai_chat_route": _post_chat(base),
+            "first_compliance_check": get(f"{base}/compliance/check"),
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def _post_chat(base: str) -> float:
+    request = urllib.request.Request(
+        f"{base}/ai/chat", data=json.dumps({"message": "ping"}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=30.0) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", default=None, help="JSON output path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            # Demo mode: no provider keys, so /ai/chat never leaves the machine
+            "OPENAI_API_KEY": "",
+            "ANTHROPIC_API_KEY": "",
+            "PERPLEXITY_API_KEY": "",
+        }
+        subprocess.run([sys.executable, "migrate.py"], cwd=API_DIR, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+
+        imports = [measure_import(env) for _ in range(args.runs)]
+        startups = [measure_first_response(env) for _ in range(args.runs)]
+
+    results = {"import_main": summarize(imports, sum(imports))}
+    for key in startups[0]:
+        values = [s[key] for s in startups]
+        results[key] = summarize(values, sum(values))
+
+    print_table(results)
+    print(f"Results written to {write_results('cold_start', {'runs': args.runs}, results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Shared helpers for the benchmark scripts: summaries, metadata and JSON output."""
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict:
+    """Throughput and latency percentiles (ms) for one benchmark case."""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(values) / count * 1000, 3) if count else 0.0,
+            "p50": round(percentile(values, 50) * 1000, 3),
+            "p95": round(percentile(values, 95) * 1000, 3),
+            "p99": round(percentile(values, 99) * 1000, 3),
+            "max": round(values[-1] * 1000, 3) if count else 0.0,
+        },
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(benchmark: str, params: Dict) -> Dict:
+    return {
+        "benchmark": benchmark,
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": params,
+    }
+
+
+def write_results(benchmark: str, params: Dict, results: Dict, output: Optional[str] = None) -> str:
+    """Write {"meta": ..., "results": ...} as JSON and return the path."""
+    meta = metadata(benchmark, params)
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{benchmark}-{meta['commit'] or 'nogit'}.json")
+    with open(output, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    return output
+
+
+def print_table(results: Dict):
+    print(f"{'case':<26} {'n':>7} {'err':>5} {'rps':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, r in results.items():
+        lat = r["latency_ms"]
+        print(f"{name:<26} {r['requests']:>7} {r['errors']:>5} {r['throughput_rps']:>10.1f} "
+              f"{lat['p50']:>9.2f} {lat['p95']:>9.2f} {lat['p99']:>9.2f}")
@@ -0,0 +1,80 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+    python benchmarks/compare.py benchmarks/results/load_test-abc123.json benchmarks/results/load_test-def456.json
+
+Exits with status 1 if any case's p50/p95/p99 latency grew, or its
+throughput fell, by more than --threshold percent, if any case reported
+more errors than the baseline, or if a baseline case is missing from the
+candidate run.
+"""
+import argparse
+import json
+import sys
+
+METRICS = [
+    ("throughput_rps", lambda r: r["throughput_rps"], True),
+    ("p50_ms", lambda r: r["latency_ms"]["p50"], False),
+    ("p95_ms", lambda r: r["latency_ms"]["p95"], False),
+    ("p99_ms", lambda r: r["latency_ms"]["p99"], False),
+]
+
+
+def change_pct(old: float, new: float) -> float:
+    return (new - old) / old * 100 if old else 0.0
+
+
+def compare(baseline, candidate, threshold: float):
+    regressions = []
+    rows = []
+    missing = []
+    for case, old in baseline["results"].items():
+        new = candidate["results"].get(case)
+        if new is None:
+            missing.append(case)
+            regressions.append((case, "missing"))
+            continue
+        for metric, get, higher_is_better in METRICS:
+            delta = change_pct(get(old), get(new))
+            regressed = -delta > threshold if higher_is_better else delta > threshold
+            rows.append((case, metric, get(old), get(new), delta, regressed))
+            if regressed:
+                regressions.append((case, metric))
+        # Any new error is a regression, whatever the threshold.
+        errors_regressed = new["errors"] > old["errors"]
+        rows.append((case, "errors", old["errors"], new["errors"],
+                     change_pct(old["errors"], new["errors"]), errors_regressed))
+        if errors_regressed:
+            regressions.append((case, "errors"))
+    return rows, regressions, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    if baseline["meta"]["params"] != candidate["meta"]["params"]:
+        print("warning: runs used different parameters; comparison may not be meaningful", file=sys.stderr)
+
+    rows, regressions, missing = compare(baseline, candidate, args.threshold)
+    print(f"{baseline['meta']['commit']} -> {candidate['meta']['commit']} (threshold {args.threshold:.0f}%)")
+    print(f"{'case':<26} {'metric':<15} {'baseline':>10} {'candidate':>10} {'change':>8}")
+    for case, metric, old, new, delta, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{case:<26} {metric:<15} {old:>10.2f} {new:>10.2f} {delta:>+7.1f}%{flag}")
+    for case in missing:
+        print(f"{case:<26} {'-':<15} {'':>10} {'missing':>10} {'':>8}  REGRESSION")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Microbenchmarks for the ETL DAG runner and RAGWorker.retrieve.
+
+    python benchmarks/microbench.py --iterations 2000
+    python benchmarks/microbench.py --with-logging    # include the DAG's INFO logging cost
+
+Results are written as JSON (see common.write_results) for benchmarks/compare.py.
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import sys
+import time
+
+from common import ROOT, print_table, summarize, write_results
+
+sys.path.insert(0, os.path.join(ROOT, "apps", "worker"))
+sys.path.insert(0, os.path.join(ROOT, "apps", "agents"))
+
+from etl_pipeline import DAG, Task, transform_normalize  # noqa: E402
+from rag_worker import RAGWorker  # noqa: E402
+
+QUERIES = [
+    "expense reports deadline",
+    "remote work approval",
+    "annual leave allowance",
+    "quarterly bonus policy",
+    "VP approval for travel",
+]
+
+
+WARMUP = 50
+
+
+def timed_loop(fn, iterations: int):
+    for i in range(WARMUP):
+        fn(i)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        t = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def bench_dag(iterations: int, tasks: int, records: int):
+    data = [{"ticker": f"T{i}", "price": 100 + i} for i in range(records)]
+
+    def build():
+        dag = DAG("bench")
+        dag.add_task(Task("extract_market_data", lambda context: data))
+        dag.add_task(Task("transform_normalize", transform_normalize))
+        for n in range(tasks - 2):
+            dag.add_task(Task(f"noop_{n}", lambda context: None))
+        return dag
+
+    dag = build()
+    return {
+        f"dag_run_{tasks}_tasks": timed_loop(lambda i: dag.run(), iterations),
+        f"dag_transform_{records}_records": timed_loop(
+            lambda i: transform_normalize({"extract_market_data": data}), iterations
+        ),
+    }
+
+
+def bench_rag(iterations: int, kb_size: int):
+    worker = RAGWorker()
+    rng = random.Random(7)
+    vocabulary = ["policy", "expense", "leave", "approval", "travel", "bonus", "remote", "report", "days", "month"]
+    for i in range(kb_size - len(worker.knowledge_base)):
+        worker.knowledge_base[f"synthetic_{i}"] = " ".join(rng.choice(vocabulary) for _ in range(12))
+
+    # retrieve() prints each query; keep that out of the terminal but inside the timing
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {
+            f"rag_retrieve_{len(worker.knowledge_base)}_docs": timed_loop(
+                lambda i: worker.retrieve(QUERIES[i % len(QUERIES)]), iterations
+            ),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--dag-tasks", type=int, default=5)
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--kb-size", type=int, default=1000, help="RAG knowledge base size (padded with synthetic docs)")
+    parser.add_argument("--with-logging", action="store_true")
+    parser.add_argument("--output", default=None, help="JSON output path")
+    args = parser.parse_args()
+
+    if not args.with_logging:
+        logging.disable(logging.INFO)
+
+    results = {}
+    results.update(bench_dag(args.iterations, max(args.dag_tasks, 2), args.records))
+    results.update(bench_rag(args.iterations, args.kb_size))
+
+    params = {
+        "iterations": args.iterations,
+        "dag_tasks": max(args.dag_tasks, 2),
+        "records": args.records,
+        "kb_size": args.kb_size,
+        "logging": args.with_logging,
+    }
+    print_table(results)
+    print(f"Results written to {write_results('microbench', params, results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()